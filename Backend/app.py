@@ -1,7 +1,8 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from sqlalchemy.exc import IntegrityError
 from dsp_engine import FilterDesigner
-from models import db, User, FilterDesign
+from models import db, User, FilterDesign, DesignArtifact, migrate_legacy_designs
 from auth import AuthManager, login_required
 from datetime import datetime
 import traceback
@@ -32,9 +33,22 @@ app.auth_manager = auth_manager
 # Initialize DSP engine
 designer = FilterDesigner()
 
+# Limits for the design comparison endpoint
+MAX_COMPARE_DESIGNS = 64
+MAX_COMPARE_POINTS = 4096
+MAX_COMPARE_TAPS = 32768  # Total b and a coefficients across all compared designs
+
 # Create tables
 with app.app_context():
     db.create_all()
+    migrated = migrate_legacy_designs()
+    if migrated:
+        print(f"✅ Migrated {migrated} legacy designs to shared artifacts")
+    # Sweep artifacts orphaned by deletes that bypassed the ORM
+    collected = DesignArtifact.collect_garbage()
+    db.session.commit()
+    if collected:
+        print(f"🧹 Removed {collected} unreferenced design artifacts")
     print("✅ Database initialized")
 
 # ============= Authentication Routes =============
@@ -126,13 +140,23 @@ def design_filter():
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
+        # Optional analysis selection; omitted means the default response bundle
+        products = params.get('products')
+        options = params.get('analysis_options', {})
+        if products is not None:
+            errors = designer.validate_analysis(products, options)
+            if errors:
+                return jsonify({'error': 'Validation failed', 'details': errors}), 400
+        elif 'analysis_options' in params:
+            return jsonify({'error': 'analysis_options requires products'}), 400
+        
         filter_class = params.get('filter_class', 'fir')
         
         # Design filter
         if filter_class == 'fir':
-            result = designer.design_fir(params)
+            result = designer.design_fir(params, products, options)
         elif filter_class == 'iir':
-            result = designer.design_iir(params)
+            result = designer.design_iir(params, products, options)
         else:
             return jsonify({'error': f'Unknown filter class: {filter_class}'}), 400
         
@@ -149,6 +173,50 @@ def design_filter():
             'details': str(e)
         }), 500
 
+@app.route('/api/analyze', methods=['POST'])
+@login_required
+def analyze_filter():
+    """Compute selected analysis products for given coefficients or specifications"""
+    try:
+        data = request.json or {}
+        products = data.get('products')
+        options = data.get('analysis_options', {})
+        
+        if not products:
+            return jsonify({'error': 'No analysis products requested'}), 400
+        errors = designer.validate_analysis(products, options)
+        if errors:
+            return jsonify({'error': 'Validation failed', 'details': errors}), 400
+        
+        if 'coefficients' in data:
+            coeffs = data['coefficients']
+            fs = data.get('sampling_freq')
+            errors = designer.validate_coefficients(coeffs, fs)
+            if errors:
+                return jsonify({'error': 'Validation failed', 'details': errors}), 400
+            b, a = coeffs['b'], coeffs['a']
+        elif 'parameters' in data:
+            params = data['parameters']
+            if not isinstance(params, dict):
+                return jsonify({'error': 'Parameters must be an object'}), 400
+            errors = designer.validate_inputs(params)
+            if errors:
+                return jsonify({'error': 'Validation failed', 'details': errors}), 400
+            b, a = designer.design_coefficients(params)
+            fs = params['sampling_freq']
+        else:
+            return jsonify({'error': 'Provide either coefficients or parameters'}), 400
+        
+        return jsonify({
+            'success': True,
+            'data': designer.analyze(b, a, fs, products, options)
+        })
+    
+    except Exception as e:
+        print(f"Analysis error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Analysis failed', 'details': str(e)}), 500
+
 # ============= Design Management Routes =============
 
 @app.route('/api/designs', methods=['GET'])
@@ -198,18 +266,26 @@ def save_design():
         if not name or not params or not results:
             return jsonify({'error': 'Missing required fields'}), 400
         
-        # Create new design
-        design = FilterDesign.from_design_data(
-            user_id=request.user_id,
-            name=name,
-            description=description,
-            params=params,
-            results=results
-        )
-        design.tags = ','.join(tags) if tags else ''
-        
-        db.session.add(design)
-        db.session.commit()
+        # A concurrent save of the same content can win the artifact insert;
+        # retry once so this save reuses that artifact
+        for attempt in range(2):
+            try:
+                design = FilterDesign.from_design_data(
+                    user_id=request.user_id,
+                    name=name,
+                    description=description,
+                    params=params,
+                    results=results
+                )
+                design.tags = ','.join(tags) if tags else ''
+                
+                db.session.add(design)
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if attempt:
+                    raise
         
         return jsonify({
             'success': True,
@@ -278,6 +354,106 @@ def delete_design(design_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to delete design', 'details': str(e)}), 500
 
+@app.route('/api/designs/compare', methods=['POST'])
+@login_required
+def compare_designs():
+    """Compare saved designs and/or new specifications on a common frequency grid"""
+    try:
+        data = request.json or {}
+        design_ids = data.get('design_ids', [])
+        specs = data.get('designs', [])
+        num_points = data.get('num_points', 512)
+        
+        if not isinstance(design_ids, list) or not isinstance(specs, list):
+            return jsonify({'error': 'design_ids and designs must be lists'}), 400
+        if not design_ids and not specs:
+            return jsonify({'error': 'No designs to compare'}), 400
+        bad_ids = [design_id for design_id in design_ids
+                   if not isinstance(design_id, int) or isinstance(design_id, bool)]
+        if bad_ids:
+            return jsonify({'error': 'Design ids must be integers', 'details': bad_ids}), 400
+        bad_specs = [index for index, params in enumerate(specs) if not isinstance(params, dict)]
+        if bad_specs:
+            return jsonify({'error': 'Designs must be parameter objects', 'details': bad_specs}), 400
+        if len(design_ids) + len(specs) > MAX_COMPARE_DESIGNS:
+            return jsonify({'error': f'At most {MAX_COMPARE_DESIGNS} designs can be compared'}), 400
+        if not isinstance(num_points, int) or not 2 <= num_points <= MAX_COMPARE_POINTS:
+            return jsonify({'error': f'num_points must be an integer between 2 and {MAX_COMPARE_POINTS}'}), 400
+        
+        candidates = []
+        labels = []
+        
+        if design_ids:
+            # Only the coefficients and specifications are needed, never the stored responses
+            rows = db.session.query(
+                FilterDesign.id, FilterDesign.name,
+                DesignArtifact.specifications, DesignArtifact.coefficients
+            ).join(DesignArtifact, FilterDesign.artifact_id == DesignArtifact.id).filter(
+                FilterDesign.id.in_(design_ids),
+                FilterDesign.user_id == request.user_id
+            ).all()
+            rows_by_id = {row.id: row for row in rows}
+            
+            missing = [design_id for design_id in design_ids if design_id not in rows_by_id]
+            if missing:
+                return jsonify({'error': 'Design not found', 'details': missing}), 404
+            
+            unusable = []
+            for design_id in design_ids:
+                row = rows_by_id[design_id]
+                coefficients = json.loads(row.coefficients) if row.coefficients else {}
+                specifications = json.loads(row.specifications) if row.specifications else {}
+                
+                # Legacy rows may have been migrated with empty specifications or coefficients
+                fs = specifications.get('sampling_freq')
+                if (not coefficients.get('b') or not coefficients.get('a')
+                        or not isinstance(fs, (int, float)) or isinstance(fs, bool) or fs <= 0):
+                    unusable.append(design_id)
+                    continue
+                
+                candidates.append({
+                    'b': coefficients['b'],
+                    'a': coefficients['a'],
+                    'specifications': specifications
+                })
+                labels.append({'source': 'saved', 'id': row.id, 'name': row.name})
+            
+            if unusable:
+                return jsonify({
+                    'error': 'Designs are missing a sampling frequency or coefficients',
+                    'details': unusable
+                }), 422
+        
+        for index, params in enumerate(specs):
+            errors = designer.validate_inputs(params)
+            if errors:
+                return jsonify({'error': 'Validation failed', 'details': {'index': index, 'errors': errors}}), 400
+            
+            b, a = designer.design_coefficients(params)
+            candidates.append({'b': b, 'a': a, 'specifications': params})
+            labels.append({'source': 'spec', 'index': index, 'name': params.get('name', f'Design {index + 1}')})
+        
+        total_taps = sum(len(c['b']) + len(c['a']) for c in candidates)
+        if total_taps > MAX_COMPARE_TAPS:
+            return jsonify({
+                'error': f'Compared designs may have at most {MAX_COMPARE_TAPS} coefficients in total',
+                'details': total_taps
+            }), 400
+        
+        result = designer.compare_designs(candidates, num_points=num_points)
+        for label, design in zip(labels, result['designs']):
+            design.update(label)
+        
+        return jsonify({
+            'success': True,
+            'comparison': result
+        })
+    
+    except Exception as e:
+        print(f"Compare error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': 'Comparison failed', 'details': str(e)}), 500
+
 # ============= Export Route =============
 
 @app.route('/api/export-coefficients', methods=['POST'])
@@ -311,10 +487,12 @@ if __name__ == '__main__':
     print("    - POST /api/auth/logout")
     print("  Design:")
     print("    - POST /api/design-filter")
+    print("    - POST /api/analyze")
     print("    - GET  /api/designs")
     print("    - GET  /api/designs/<id>")
     print("    - POST /api/designs")
     print("    - PUT  /api/designs/<id>")
     print("    - DELETE /api/designs/<id>")
+    print("    - POST /api/designs/compare")
     print("    - POST /api/export-coefficients")
     app.run(debug=True, port=5000)
\ No newline at end of file
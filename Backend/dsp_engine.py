@@ -1,8 +1,239 @@
 import numpy as np
 from scipy import signal
 from scipy.signal import freqz
+from functools import cached_property
 import warnings
 
+# Upper bound on elements in one chunk of the stacked comparison's z^-n basis
+STACKED_BASIS_ELEMENTS = 1 << 20
+
+def _finite_or_none(value):
+    """Convert to float for JSON, mapping NaN and infinities to None"""
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+class FilterAnalysis:
+    """Lazily computed analysis products for a single (b, a) filter
+    
+    Every product is derived on first access from shared intermediates: the
+    numerator and denominator are evaluated on the frequency grid once and
+    reused by magnitude, phase and delay products; step responses reuse the
+    impulse response.
+    """
+    
+    def __init__(self, b, a, fs, num_points=2048, impulse_length=None, step_length=100,
+                 root_tolerance=0.05, settling_tolerance=0.02):
+        self.b = np.atleast_1d(np.asarray(b, dtype=float))
+        self.a = np.atleast_1d(np.asarray(a, dtype=float))
+        self.fs = fs
+        self.num_points = int(num_points)
+        self.impulse_length = int(impulse_length or max(len(self.b), 50))
+        self.step_length = int(step_length)
+        self.root_tolerance = root_tolerance
+        self.settling_tolerance = settling_tolerance
+        self._impulse = None
+    
+    @property
+    def is_fir(self):
+        return len(self.a) == 1
+    
+    # ----- Shared frequency-domain intermediates -----
+    
+    @cached_property
+    def _numerator(self):
+        w, num = freqz(self.b, 1, worN=self.num_points, fs=self.fs)
+        return w, num
+    
+    @cached_property
+    def _denominator(self):
+        if self.is_fir:
+            return np.full(self.num_points, self.a[0], dtype=complex)
+        return freqz(self.a, 1, worN=self.num_points, fs=self.fs)[1]
+    
+    @cached_property
+    def frequency(self):
+        return self._numerator[0]
+    
+    @cached_property
+    def _omega(self):
+        """Grid in radians/sample"""
+        return 2 * np.pi * self.frequency / self.fs
+    
+    @cached_property
+    def response(self):
+        """Complex frequency response H(e^jw)"""
+        return self._numerator[1] / self._denominator
+    
+    # ----- Frequency-domain products -----
+    
+    @cached_property
+    def magnitude(self):
+        return np.abs(self.response)
+    
+    @cached_property
+    def magnitude_db(self):
+        return 20 * np.log10(self.magnitude + 1e-10)
+    
+    @cached_property
+    def phase(self):
+        return np.angle(self.response)
+    
+    @cached_property
+    def unwrapped_phase(self):
+        return np.unwrap(self.phase)
+    
+    @cached_property
+    def group_delay(self):
+        """Group delay in samples, NaN at zeros of the response"""
+        # tau = Re(sum(n b_n z^-n) / B(z)) - Re(sum(n a_n z^-n) / A(z))
+        num = self._numerator[1]
+        nb = freqz(self.b * np.arange(len(self.b)), 1, worN=self.num_points, fs=self.fs)[1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gd = np.real(nb / num)
+            if not self.is_fir:
+                na = freqz(self.a * np.arange(len(self.a)), 1, worN=self.num_points, fs=self.fs)[1]
+                gd -= np.real(na / self._denominator)
+        gd[np.abs(num) < 1e-8 * np.abs(num).max()] = np.nan
+        return gd
+    
+    @cached_property
+    def phase_delay(self):
+        """Phase delay in samples, NaN at DC"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delay = -self.unwrapped_phase / self._omega
+        delay[self._omega == 0] = np.nan
+        return delay
+    
+    @cached_property
+    def zero_phase(self):
+        """Real-valued zero-phase response
+        
+        For FIR filters this is the signed amplitude response with the linear-phase
+        term (len(b) - 1) / 2 removed. IIR filters have no linear-phase form, so the
+        response of forward-backward (filtfilt) filtering, |H|^2, is returned.
+        """
+        if self.is_fir:
+            center = (len(self.b) - 1) / 2
+            return np.real(self.response * np.exp(1j * self._omega * center))
+        return self.magnitude ** 2
+    
+    # ----- Pole-zero -----
+    
+    def _unique_roots(self, coeffs):
+        """Roots of a polynomial grouped with their multiplicities
+        
+        np.roots returns an m-fold root as a small ring of m roots, so nearby roots
+        are clustered and a cluster is kept as one root only if the polynomial and
+        its first m - 1 derivatives vanish at the cluster centroid.
+        """
+        groups = []
+        for root in np.roots(coeffs):
+            for group in groups:
+                if np.min(np.abs(np.array(group) - root)) <= self.root_tolerance:
+                    group.append(root)
+                    break
+            else:
+                groups.append([root])
+        
+        unique = []
+        for group in groups:
+            center = np.mean(group)
+            if len(group) > 1 and not self._is_multiple_root(coeffs, center, len(group)):
+                unique.extend((root, 1) for root in group)
+            else:
+                unique.append((center, len(group)))
+        
+        return [
+            {'value': [float(r.real), float(r.imag)], 'multiplicity': m}
+            for r, m in unique
+        ]
+    
+    @staticmethod
+    def _is_multiple_root(coeffs, z, multiplicity, rtol=1e-10):
+        """Check that p(z), p'(z), ... up to the given multiplicity are numerically zero"""
+        poly = np.poly1d(coeffs)
+        scale = np.poly1d(np.abs(coeffs))
+        for _ in range(multiplicity):
+            if abs(poly(z)) > rtol * max(scale(abs(z)), np.finfo(float).tiny):
+                return False
+            poly = poly.deriv()
+            scale = scale.deriv()
+        return True
+    
+    @staticmethod
+    def _trim_residue(coeffs):
+        """Zero out rounding residue, e.g. the ~1e-19 end taps of window designs"""
+        coeffs = coeffs.copy()
+        coeffs[np.abs(coeffs) <= np.finfo(float).eps * np.abs(coeffs).max()] = 0.0
+        return coeffs
+    
+    @staticmethod
+    def _leading_coefficient(coeffs):
+        """First non-zero coefficient, matching the leading zeros np.roots strips"""
+        nonzero = np.flatnonzero(coeffs)
+        return coeffs[nonzero[0]] if len(nonzero) else 0.0
+    
+    @cached_property
+    def pole_zero(self):
+        """Zeros and poles grouped with their multiplicities"""
+        b = self._trim_residue(self.b)
+        a = self._trim_residue(self.a)
+        return {
+            'zeros': self._unique_roots(b),
+            'poles': self._unique_roots(a),
+            'gain': _finite_or_none(self._leading_coefficient(b) / self._leading_coefficient(a))
+        }
+    
+    # ----- Time-domain products -----
+    
+    def impulse_response(self, length=None):
+        """Impulse response, reusing any longer response already computed"""
+        length = length or self.impulse_length
+        if self._impulse is None or len(self._impulse) < length:
+            # Size for both time-domain products so step and impulse share one filter run
+            full_length = max(length, self.impulse_length, self.step_length)
+            self._impulse = signal.lfilter(self.b, self.a, signal.unit_impulse(full_length))
+        return self._impulse[:length]
+    
+    def step_response(self, length=None):
+        """Step response as the running sum of the impulse response"""
+        return np.cumsum(self.impulse_response(length or self.step_length))
+    
+    @cached_property
+    def settling(self):
+        """Step-response metrics: settling time, rise time and overshoot"""
+        step = self.step_response()
+        den_sum = np.sum(self.a)
+        final = float(np.sum(self.b) / den_sum) if abs(den_sum) > 1e-12 else float(step[-1])
+        
+        # Band is relative to the final value, or to the peak for filters that settle at zero
+        scale = abs(final) if abs(final) > 1e-6 else float(np.max(np.abs(step)))
+        outside = np.nonzero(np.abs(step - final) > self.settling_tolerance * scale)[0]
+        settled = not len(outside) or outside[-1] < len(step) - 1
+        settling_time = (int(outside[-1]) + 1 if len(outside) else 0) if settled else None
+        
+        rise_time = None
+        overshoot = None
+        if abs(final) > 1e-6:
+            normalized = step / final
+            above_10 = np.nonzero(normalized >= 0.1)[0]
+            above_90 = np.nonzero(normalized >= 0.9)[0]
+            if len(above_10) and len(above_90):
+                rise_time = int(above_90[0] - above_10[0])
+            overshoot = float(max(0.0, (np.max(normalized) - 1) * 100))
+        
+        return {
+            'final_value': _finite_or_none(final),
+            'settled': bool(settled),
+            'settling_time_samples': settling_time,
+            'settling_time_s': settling_time / self.fs if settling_time is not None else None,
+            'rise_time_samples': rise_time,
+            'overshoot_percent': _finite_or_none(overshoot),
+            'tolerance': self.settling_tolerance
+        }
+
 class FilterDesigner:
     """DSP Engine for FIR and IIR filter design"""
     
@@ -10,6 +241,17 @@ class FilterDesigner:
         self.valid_fir_methods = ['window', 'remez']
         self.valid_iir_methods = ['butterworth', 'chebyshev1', 'chebyshev2', 'elliptic']
         self.valid_windows = ['hamming', 'hanning', 'blackman', 'kaiser', 'rectangular']
+        self.frequency_products = ['magnitude', 'magnitude_db', 'phase', 'unwrapped_phase',
+                                   'group_delay', 'phase_delay', 'zero_phase']
+        self.valid_analysis_products = self.frequency_products + ['pole_zero', 'impulse_response',
+                                                                  'step_response', 'settling']
+        self.analysis_option_limits = {
+            'num_points': (2, 16384),
+            'impulse_length': (1, 10000),
+            'step_length': (1, 10000),
+            'root_tolerance': (1e-12, 1),
+            'settling_tolerance': (1e-6, 0.5)
+        }
     
     def validate_inputs(self, params):
         """Validate filter design parameters"""
@@ -33,12 +275,14 @@ class FilterDesigner:
         
         return errors
     
-    def design_fir(self, params):
+    def design_fir(self, params, products=None, options=None):
         """Design FIR filter"""
+        b, a = self._fir_coefficients(params)
+        return self._compute_responses(b, a, params['sampling_freq'], products, options)
+    
+    def _fir_coefficients(self, params):
+        """Compute FIR coefficients for the requested method"""
         method = params.get('method', 'window')
-        fs = params['sampling_freq']
-        filter_type = params['filter_type']
-        numtaps = params.get('order', 51)
         
         if method == 'window':
             return self._design_fir_window(params)
@@ -73,7 +317,7 @@ class FilterDesigner:
         # FIR filters have a=[1]
         a = np.array([1.0])
         
-        return self._compute_responses(b, a, fs)
+        return b, a
     
     def _design_fir_remez(self, params):
         """FIR design using Parks-McClellan (Remez) algorithm"""
@@ -90,10 +334,15 @@ class FilterDesigner:
         b = signal.remez(numtaps, bands_hz, desired, fs=fs)
         a = np.array([1.0])
         
-        return self._compute_responses(b, a, fs)
+        return b, a
     
-    def design_iir(self, params):
+    def design_iir(self, params, products=None, options=None):
         """Design IIR filter"""
+        b, a = self._iir_coefficients(params)
+        return self._compute_responses(b, a, params['sampling_freq'], products, options)
+    
+    def _iir_coefficients(self, params):
+        """Compute IIR coefficients for the requested method"""
         method = params.get('method', 'butterworth')
         fs = params['sampling_freq']
         filter_type = params['filter_type']
@@ -123,24 +372,96 @@ class FilterDesigner:
         else:
             raise ValueError(f"Unknown IIR method: {method}")
         
-        return self._compute_responses(b, a, fs)
+        return b, a
+    
+    def design_coefficients(self, params):
+        """Design a filter and return only its (b, a) coefficients"""
+        filter_class = params.get('filter_class', 'fir')
+        
+        if filter_class == 'fir':
+            return self._fir_coefficients(params)
+        elif filter_class == 'iir':
+            return self._iir_coefficients(params)
+        else:
+            raise ValueError(f"Unknown filter class: {filter_class}")
+    
+    def validate_analysis(self, products, options):
+        """Validate requested analysis products and options"""
+        errors = []
+        
+        if not isinstance(products, list):
+            return ["Products must be a list"]
+        if options is not None and not isinstance(options, dict):
+            return ["Analysis options must be an object"]
+        for product in products:
+            if product not in self.valid_analysis_products:
+                errors.append(f"Unknown analysis product: {product}")
+        
+        for key, value in (options or {}).items():
+            if key not in self.analysis_option_limits:
+                errors.append(f"Unknown analysis option: {key}")
+                continue
+            low, high = self.analysis_option_limits[key]
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not low <= value <= high:
+                errors.append(f"Option {key} must be between {low} and {high}")
+            elif key in ['num_points', 'impulse_length', 'step_length'] and int(value) != value:
+                errors.append(f"Option {key} must be an integer")
+        
+        return errors
+    
+    def validate_coefficients(self, coeffs, fs):
+        """Validate raw coefficients and sampling frequency supplied for analysis"""
+        errors = []
+        
+        if not isinstance(fs, (int, float)) or isinstance(fs, bool) or not fs > 0:
+            errors.append("Sampling frequency must be a positive number")
+        if not isinstance(coeffs, dict):
+            return errors + ["Coefficients must be an object with b and a"]
+        
+        for key in ['b', 'a']:
+            values = coeffs.get(key)
+            if not isinstance(values, list) or not values:
+                errors.append(f"Coefficients {key} must be a non-empty list")
+            elif not all(isinstance(v, (int, float)) and not isinstance(v, bool) and np.isfinite(v) for v in values):
+                errors.append(f"Coefficients {key} must be finite numbers")
+            elif key == 'a' and values[0] == 0:
+                errors.append("Leading denominator coefficient a[0] must be non-zero")
+        
+        return errors
+    
+    def analyze(self, b, a, fs, products, options=None):
+        """Compute only the requested analysis products for (b, a)"""
+        analysis = FilterAnalysis(b, a, fs, **(options or {}))
+        result = {}
+        
+        if any(p in self.frequency_products for p in products):
+            result['frequency'] = analysis.frequency.tolist()
+        
+        for product in products:
+            if product in self.frequency_products:
+                result[product] = self._to_json_list(getattr(analysis, product), decimals=None)
+            elif product in ['impulse_response', 'step_response']:
+                result[product] = self._to_json_list(getattr(analysis, product)(), decimals=None)
+            else:
+                result[product] = getattr(analysis, product)
+        
+        return result
     
-    def _compute_responses(self, b, a, fs):
-        """Compute frequency, impulse, and pole-zero responses"""
-        # Frequency response
-        w, h = freqz(b, a, worN=2048, fs=fs)
-        magnitude_db = 20 * np.log10(np.abs(h) + 1e-10)
-        phase = np.angle(h)
+    def _compute_responses(self, b, a, fs, products=None, options=None):
+        """Compute frequency, impulse, and pole-zero responses
         
-        # Impulse response - use lfilter for better compatibility
-        impulse_len = max(len(b), 50)
-        impulse = signal.unit_impulse(impulse_len)
-        impulse_response = signal.lfilter(b, a, impulse)
+        Without products this returns the default bundle shown by the UI;
+        otherwise only the named analysis products are computed.
+        """
+        coefficients = {
+            'b': b.tolist(),
+            'a': a.tolist()
+        }
         
-        # Step response
-        step_len = 100
-        step = np.ones(step_len)
-        step_response = signal.lfilter(b, a, step)
+        if products is not None:
+            return {'coefficients': coefficients, **self.analyze(b, a, fs, products, options)}
+        
+        analysis = FilterAnalysis(b, a, fs)
         
         # Pole-zero (for IIR)
         poles = []
@@ -153,23 +474,258 @@ class FilterDesigner:
             poles = [[p.real, p.imag] for p in poles]
         
         return {
-            'coefficients': {
-                'b': b.tolist(),
-                'a': a.tolist()
-            },
+            'coefficients': coefficients,
             'frequency_response': {
-                'frequency': w.tolist(),
-                'magnitude_db': magnitude_db.tolist(),
-                'phase': phase.tolist()
+                'frequency': analysis.frequency.tolist(),
+                'magnitude_db': analysis.magnitude_db.tolist(),
+                'phase': analysis.phase.tolist()
             },
-            'impulse_response': impulse_response.tolist(),
-            'step_response': step_response.tolist(),
+            'impulse_response': analysis.impulse_response().tolist(),
+            'step_response': analysis.step_response().tolist(),
             'pole_zero': {
                 'poles': poles,
                 'zeros': zeros
             }
         }
     
+    def compare_designs(self, candidates, num_points=512):
+        """Evaluate several designs on one common frequency grid and compute overlay metrics
+        
+        Each candidate is a dict with 'b', 'a' and 'specifications'. Designs sharing a
+        sampling frequency are evaluated together as stacked matrix products. Overlays
+        use a grid common to all candidates; metrics use each sampling frequency's own
+        grid up to its Nyquist, so they don't depend on the other candidates.
+        """
+        if not candidates:
+            raise ValueError("No designs to compare")
+        
+        # Common grid spans the lowest Nyquist frequency among the candidates
+        nyquist = min(c['specifications']['sampling_freq'] for c in candidates) / 2
+        freqs = np.linspace(0, nyquist, num_points, endpoint=False)
+        
+        magnitude_db = np.empty((len(candidates), num_points))
+        group_delay = np.empty((len(candidates), num_points))
+        metrics = [None] * len(candidates)
+        
+        groups = {}
+        for i, c in enumerate(candidates):
+            groups.setdefault(c['specifications']['sampling_freq'], []).append(i)
+        
+        for fs, indices in groups.items():
+            b_list = [candidates[i]['b'] for i in indices]
+            a_list = [candidates[i]['a'] for i in indices]
+            
+            h, gd = self._stacked_response(b_list, a_list, 2 * np.pi * freqs / fs)
+            magnitude_db[indices] = 20 * np.log10(np.abs(h) + 1e-10)
+            # Group delay is meaningless where the response sits at the -200 dB floor
+            group_delay[indices] = np.where(np.abs(h) < 1e-10, np.nan, gd)
+            
+            own_freqs, own_h, own_gd = freqs, h, gd
+            if fs / 2 != nyquist:
+                own_freqs = np.linspace(0, fs / 2, num_points, endpoint=False)
+                own_h, own_gd = self._stacked_response(b_list, a_list, 2 * np.pi * own_freqs / fs)
+            own_db = 20 * np.log10(np.abs(own_h) + 1e-10)
+            
+            for row, i in enumerate(indices):
+                metrics[i] = self._overlay_metrics(
+                    own_freqs, own_db[row], own_gd[row], fs / 2,
+                    b_list[row], a_list[row], candidates[i]['specifications']
+                )
+        
+        return {
+            'frequency': self._to_json_list(freqs),
+            'designs': [
+                {
+                    'metrics': metrics[i],
+                    'magnitude_db': self._to_json_list(magnitude_db[i]),
+                    'group_delay': self._to_json_list(group_delay[i])
+                }
+                for i in range(len(candidates))
+            ]
+        }
+    
+    def _stacked_response(self, b_list, a_list, omega):
+        """Frequency response and group delay of K filters as (K, F) arrays"""
+        lengths = np.array([max(len(b), len(a)) for b, a in zip(b_list, a_list)])
+        num_taps = lengths.max()
+        B = np.zeros((len(b_list), num_taps))
+        A = np.zeros((len(a_list), num_taps))
+        for k, (b, a) in enumerate(zip(b_list, a_list)):
+            B[k, :len(b)] = b
+            A[k, :len(a)] = a
+        
+        num = np.zeros((len(b_list), len(omega)), dtype=complex)
+        den = np.zeros_like(num)
+        num_n = np.zeros_like(num)
+        den_n = np.zeros_like(num)
+        
+        # Build the z^-n basis in tap chunks to bound memory, skipping filters already exhausted
+        chunk = max(1, STACKED_BASIS_ELEMENTS // len(omega))
+        for first_tap in range(0, num_taps, chunk):
+            taps = slice(first_tap, min(first_tap + chunk, num_taps))
+            n = np.arange(taps.start, taps.stop)
+            E = np.exp(-1j * np.outer(n, omega))
+            rows = lengths > first_tap
+            num[rows] += B[rows, taps] @ E
+            den[rows] += A[rows, taps] @ E
+            num_n[rows] += (B[rows, taps] * n) @ E
+            den_n[rows] += (A[rows, taps] * n) @ E
+        
+        # tau = Re(sum(n b_n z^-n) / B(z)) - Re(sum(n a_n z^-n) / A(z))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gd = np.real(num_n / num) - np.real(den_n / den)
+            h = num / den
+        
+        return h, gd
+    
+    def _band_regions(self, specs, nyquist):
+        """Passband and stopband intervals in Hz, as lists of (low, high)
+        
+        Intervals are clipped to [0, nyquist] and empty ones are dropped.
+        """
+        fs = specs['sampling_freq']
+        
+        def clip(regions):
+            clipped = [(max(0.0, low), min(nyquist, high)) for low, high in regions]
+            return [(low, high) for low, high in clipped if high > low]
+        
+        # Remez designs are defined by their band edges rather than the filter type
+        if specs.get('filter_class') == 'fir' and specs.get('method') == 'remez':
+            bands = [f * (fs / 2) for f in specs.get('bands', [0, 0.1, 0.2, 0.5])]
+            desired = specs.get('desired', [1, 0])
+            pass_regions = [(bands[2 * i], bands[2 * i + 1]) for i, d in enumerate(desired) if d]
+            stop_regions = [(bands[2 * i], bands[2 * i + 1]) for i, d in enumerate(desired) if not d]
+            return clip(pass_regions), clip(stop_regions)
+        
+        filter_type = specs.get('filter_type')
+        passband = specs.get('passband_freq')
+        if filter_type is None or passband is None:
+            return [], []
+        edges = passband if isinstance(passband, list) else [passband]
+        
+        # Stopband starts at the specified edge, or a default guard band past the cutoff
+        stopband = specs.get('stopband_freq')
+        if stopband is None:
+            guard = 0.1 * nyquist
+            if filter_type == 'lowpass':
+                stopband = edges[0] + guard
+            elif filter_type == 'highpass':
+                stopband = edges[0] - guard
+            elif filter_type == 'bandpass':
+                stopband = [edges[0] - guard, edges[1] + guard]
+            elif filter_type == 'bandstop':
+                # Narrow notches are measured over their middle third, away from the cutoffs
+                width = edges[1] - edges[0]
+                if width > 3 * guard:
+                    stopband = [edges[0] + guard, edges[1] - guard]
+                else:
+                    stopband = [edges[0] + width / 3, edges[1] - width / 3]
+        stop_edges = stopband if isinstance(stopband, list) else [stopband]
+        
+        if filter_type == 'lowpass':
+            regions = [(0, edges[0])], [(stop_edges[0], nyquist)]
+        elif filter_type == 'highpass':
+            regions = [(edges[0], nyquist)], [(0, stop_edges[0])]
+        elif filter_type == 'bandpass':
+            regions = [(edges[0], edges[1])], [(0, stop_edges[0]), (stop_edges[1], nyquist)]
+        elif filter_type == 'bandstop':
+            regions = [(0, edges[0]), (edges[1], nyquist)], [(stop_edges[0], stop_edges[1])]
+        else:
+            raise ValueError(f"Unknown filter type: {filter_type}")
+        
+        return clip(regions[0]), clip(regions[1])
+    
+    def _overlay_metrics(self, freqs, magnitude_db, group_delay, nyquist, b, a, specs):
+        """Passband ripple, stopband attenuation, transition width, delay flatness and cost
+        
+        Levels are relative to the passband peak; ripple excludes the roll-off past the last extremum.
+        """
+        pass_regions, stop_regions = self._band_regions(specs, nyquist)
+        
+        # Direct-form cost: one MAC per non-zero feedforward and feedback coefficient
+        macs = int(np.count_nonzero(b) + np.count_nonzero(np.asarray(a)[1:]))
+        
+        def region_indices(low, high):
+            return np.nonzero((freqs >= low) & (freqs <= high))[0]
+        
+        def first(idx, condition):
+            hits = idx[condition]
+            return int(hits[0]) if len(hits) else None
+        
+        pass_spans = [region_indices(low, high) for low, high in pass_regions]
+        pass_spans = [span for span in pass_spans if len(span)]
+        if not pass_spans:
+            return {
+                'passband_ripple_db': None,
+                'stopband_atten_db': None,
+                'transition_width_hz': None,
+                'group_delay_variation_samples': None,
+                'macs_per_sample': macs
+            }
+        
+        ref_db = max(magnitude_db[span].max() for span in pass_spans)
+        half_power_db = ref_db - 3
+        target_db = ref_db - specs.get('stopband_atten', 40)
+        
+        ripple_values = []
+        delay_values = []
+        widths = []
+        for span in pass_spans:
+            peak = int(span[np.argmax(magnitude_db[span])])
+            band_ends = []
+            for step, bound in ((-1, span[0]), (1, span[-1])):
+                idx = np.arange(peak, -1, -1) if step < 0 else np.arange(peak, len(freqs))
+                crossing = first(idx, magnitude_db[idx] < half_power_db)
+                
+                if crossing is not None and crossing * step <= bound * step:
+                    band_ends.append(crossing - step)
+                else:
+                    band_ends.append(int(bound))
+                
+                if crossing is not None:
+                    beyond = idx[np.searchsorted(idx * step, crossing * step):]
+                    stop = first(beyond, magnitude_db[beyond] <= target_db)
+                    if stop is not None:
+                        widths.append(abs(freqs[stop] - freqs[crossing]))
+            
+            low, high = band_ends
+            band = np.arange(low, high + 1)
+            delay_values.append(group_delay[band])
+            
+            # Trim monotonic roll-off at interior band ends back to the outermost local extremum
+            slope = np.sign(np.diff(magnitude_db[band]))
+            extrema = band[1:-1][slope[:-1] != slope[1:]] if len(band) > 2 else np.array([], dtype=int)
+            if low > 0:
+                low = int(extrema[0]) if len(extrema) else peak
+            if high < len(freqs) - 1:
+                high = int(extrema[-1]) if len(extrema) else peak
+            ripple_values.append(magnitude_db[min(low, high):max(low, high) + 1])
+        
+        ripple = np.concatenate(ripple_values)
+        delays = np.concatenate(delay_values)
+        delays = delays[np.isfinite(delays)]
+        
+        stopband_atten = None
+        stop_spans = [region_indices(low, high) for low, high in stop_regions]
+        stop_spans = [span for span in stop_spans if len(span)]
+        if stop_spans:
+            stopband_atten = ref_db - max(magnitude_db[span].max() for span in stop_spans)
+        
+        return {
+            'passband_ripple_db': _finite_or_none(np.ptp(ripple)),
+            'stopband_atten_db': _finite_or_none(stopband_atten),
+            'transition_width_hz': _finite_or_none(max(widths)) if widths else None,
+            'group_delay_variation_samples': _finite_or_none(np.ptp(delays)) if len(delays) else None,
+            'macs_per_sample': macs
+        }
+    
+    @staticmethod
+    def _to_json_list(values, decimals=4):
+        """Round for compact transfer and map NaN to None"""
+        if decimals is not None:
+            values = np.round(values, decimals)
+        return [None if not np.isfinite(v) else v for v in values.tolist()]
+    
     def export_coefficients(self, coeffs, export_format='text'):
         """Export coefficients in various formats"""
         b = coeffs['b']
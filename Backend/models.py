@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
 from datetime import datetime
+import hashlib
 import json
 
 db = SQLAlchemy()
@@ -29,6 +31,94 @@ class User(db.Model):
             'design_count': len(self.designs)
         }
 
+def _canonical_json(value):
+    """Serialize to a stable JSON string so equal content hashes equally"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+class DesignArtifact(db.Model):
+    """Immutable, content-addressed storage for design specifications and results"""
+    __tablename__ = 'design_artifacts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)  # SHA-256 hex
+    
+    # Design content (canonical JSON, never modified after insert)
+    specifications = db.Column(db.Text)  # JSON string of all parameters
+    coefficients = db.Column(db.Text)    # JSON: {b: [...], a: [...]}
+    responses = db.Column(db.Text)       # JSON: frequency, impulse, step responses
+    
+    # Number of FilterDesign rows pointing at this artifact
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    designs = db.relationship('FilterDesign', backref='artifact', lazy=True)
+    
+    @staticmethod
+    def compute_hash(specifications, coefficients, responses):
+        """Hash the canonical JSON strings of an artifact's content"""
+        digest = hashlib.sha256()
+        for part in (specifications, coefficients, responses):
+            encoded = part.encode('utf-8')
+            # Length-prefix each part so field boundaries are unambiguous
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def acquire(specifications, coefficients, responses):
+        """Return the artifact for this content, creating it if needed, and take a reference"""
+        specifications = _canonical_json(specifications)
+        coefficients = _canonical_json(coefficients)
+        responses = _canonical_json(responses)
+        content_hash = DesignArtifact.compute_hash(specifications, coefficients, responses)
+        
+        artifact = DesignArtifact.query.filter_by(content_hash=content_hash).first()
+        if not artifact:
+            artifact = DesignArtifact(
+                content_hash=content_hash,
+                specifications=specifications,
+                coefficients=coefficients,
+                responses=responses,
+                ref_count=1
+            )
+            # A concurrent insert of the same content raises IntegrityError on flush;
+            # callers roll back and retry, finding the winner's row on the next lookup
+            db.session.add(artifact)
+        else:
+            # Increment in SQL so concurrent saves of the same design don't lose updates
+            artifact.ref_count = DesignArtifact.ref_count + 1
+        db.session.flush()
+        return artifact
+    
+    @staticmethod
+    def release(connection, artifact_id):
+        """Drop a reference and delete the artifact once nothing points at it
+        
+        Runs on the flush connection so it can be called from mapper events.
+        """
+        artifacts = DesignArtifact.__table__
+        connection.execute(
+            artifacts.update()
+            .where(artifacts.c.id == artifact_id)
+            .values(ref_count=artifacts.c.ref_count - 1)
+        )
+        connection.execute(
+            artifacts.delete()
+            .where(artifacts.c.id == artifact_id, artifacts.c.ref_count <= 0)
+        )
+    
+    @staticmethod
+    def collect_garbage():
+        """Recount references and delete unreferenced artifacts, returning the count removed
+        
+        Bulk deletes skip the after_delete listener, so stored counts may be stale.
+        """
+        db.session.execute(text(
+            'UPDATE design_artifacts SET ref_count = '
+            '(SELECT COUNT(*) FROM filter_designs WHERE filter_designs.artifact_id = design_artifacts.id)'
+        ))
+        return DesignArtifact.query.filter(DesignArtifact.ref_count <= 0).delete(synchronize_session='fetch')
+
 class FilterDesign(db.Model):
     """Model for storing filter designs"""
     __tablename__ = 'filter_designs'
@@ -42,15 +132,13 @@ class FilterDesign(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Filter specifications (stored as JSON)
+    # Summary of the filter, kept here so listings never touch the artifact
     filter_class = db.Column(db.String(10))  # 'fir' or 'iir'
     filter_type = db.Column(db.String(20))   # 'lowpass', 'highpass', etc.
     method = db.Column(db.String(50))
-    specifications = db.Column(db.Text)  # JSON string of all parameters
     
-    # Filter results (stored as JSON)
-    coefficients = db.Column(db.Text)  # JSON: {b: [...], a: [...]}
-    responses = db.Column(db.Text)     # JSON: frequency, impulse, step responses
+    # Shared specifications, coefficients and responses
+    artifact_id = db.Column(db.Integer, db.ForeignKey('design_artifacts.id'), index=True)
     
     # Tags for organization
     tags = db.Column(db.String(500))  # Comma-separated tags
@@ -71,9 +159,10 @@ class FilterDesign(db.Model):
         }
         
         if include_details:
-            base_dict['specifications'] = json.loads(self.specifications) if self.specifications else {}
-            base_dict['coefficients'] = json.loads(self.coefficients) if self.coefficients else {}
-            base_dict['responses'] = json.loads(self.responses) if self.responses else {}
+            artifact = self.artifact
+            base_dict['specifications'] = json.loads(artifact.specifications) if artifact and artifact.specifications else {}
+            base_dict['coefficients'] = json.loads(artifact.coefficients) if artifact and artifact.coefficients else {}
+            base_dict['responses'] = json.loads(artifact.responses) if artifact and artifact.responses else {}
         
         return base_dict
     
@@ -87,12 +176,55 @@ class FilterDesign(db.Model):
         design.filter_class = params.get('filter_class')
         design.filter_type = params.get('filter_type')
         design.method = params.get('method')
-        design.specifications = json.dumps(params)
-        design.coefficients = json.dumps(results.get('coefficients', {}))
-        design.responses = json.dumps({
-            'frequency_response': results.get('frequency_response', {}),
-            'impulse_response': results.get('impulse_response', []),
-            'step_response': results.get('step_response', []),
-            'pole_zero': results.get('pole_zero', {})
-        })
-        return design
\ No newline at end of file
+        design.artifact = DesignArtifact.acquire(
+            specifications=params,
+            coefficients=results.get('coefficients', {}),
+            responses={
+                'frequency_response': results.get('frequency_response', {}),
+                'impulse_response': results.get('impulse_response', []),
+                'step_response': results.get('step_response', []),
+                'pole_zero': results.get('pole_zero', {})
+            }
+        )
+        return design
+
+@event.listens_for(FilterDesign, 'after_delete')
+def _release_design_artifact(mapper, connection, design):
+    """Keep artifact reference counts right on every delete path, including user cascades"""
+    if design.artifact_id is not None:
+        DesignArtifact.release(connection, design.artifact_id)
+
+def migrate_legacy_designs():
+    """Move inline design content from pre-artifact databases into design_artifacts"""
+    columns = {column['name'] for column in inspect(db.engine).get_columns('filter_designs')}
+    if 'specifications' not in columns:
+        return 0
+    
+    if 'artifact_id' not in columns:
+        db.session.execute(text(
+            'ALTER TABLE filter_designs ADD COLUMN artifact_id INTEGER REFERENCES design_artifacts (id)'
+        ))
+    db.session.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_filter_designs_artifact_id ON filter_designs (artifact_id)'
+    ))
+    
+    rows = db.session.execute(text(
+        'SELECT id, specifications, coefficients, responses FROM filter_designs '
+        'WHERE artifact_id IS NULL'
+    )).fetchall()
+    
+    for row in rows:
+        artifact = DesignArtifact.acquire(
+            specifications=json.loads(row.specifications) if row.specifications else {},
+            coefficients=json.loads(row.coefficients) if row.coefficients else {},
+            responses=json.loads(row.responses) if row.responses else {}
+        )
+        # Clear the inline copies so the space is reclaimed
+        db.session.execute(
+            text('UPDATE filter_designs SET artifact_id = :artifact_id, specifications = NULL, '
+                 'coefficients = NULL, responses = NULL WHERE id = :id'),
+            {'artifact_id': artifact.id, 'id': row.id}
+        )
+    
+    db.session.commit()
+    return len(rows)
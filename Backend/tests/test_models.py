@@ -0,0 +1,144 @@
+import json
+
+from sqlalchemy import text
+
+from models import db, DesignArtifact, FilterDesign, User, migrate_legacy_designs
+
+PARAMS = {
+    'filter_class': 'iir',
+    'filter_type': 'lowpass',
+    'method': 'butterworth',
+    'sampling_freq': 1000,
+    'passband_freq': 100,
+    'order': 4
+}
+
+
+def design_results(client, auth_headers, params=PARAMS):
+    response = client.post('/api/design-filter', json=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json['data']
+
+
+def save(client, auth_headers, name, results, params=PARAMS, **extra):
+    return client.post('/api/designs', json={
+        'name': name, 'parameters': params, 'results': results, **extra
+    }, headers=auth_headers)
+
+
+def artifact_counts():
+    return [(a.id, a.ref_count) for a in DesignArtifact.query.order_by(DesignArtifact.id)]
+
+
+def test_identical_saves_share_one_artifact(client, auth_headers):
+    results = design_results(client, auth_headers)
+    ids = [save(client, auth_headers, f'design {i}', results).json['design']['id'] for i in range(3)]
+
+    assert DesignArtifact.query.count() == 1
+    assert DesignArtifact.query.one().ref_count == 3
+    assert len({db.session.get(FilterDesign, i).artifact_id for i in ids}) == 1
+
+    detail = client.get(f'/api/designs/{ids[0]}', headers=auth_headers).json['design']
+    assert detail['coefficients'] == results['coefficients']
+    assert detail['specifications'] == PARAMS
+
+
+def test_different_content_gets_its_own_artifact(client, auth_headers):
+    save(client, auth_headers, 'order 4', design_results(client, auth_headers))
+    params = {**PARAMS, 'order': 6}
+    save(client, auth_headers, 'order 6', design_results(client, auth_headers, params), params)
+
+    assert [count for _, count in artifact_counts()] == [1, 1]
+
+
+def test_delete_releases_and_collects_artifact(client, auth_headers):
+    results = design_results(client, auth_headers)
+    first, second = (save(client, auth_headers, name, results).json['design']['id'] for name in 'ab')
+
+    assert client.delete(f'/api/designs/{first}', headers=auth_headers).status_code == 200
+    assert [count for _, count in artifact_counts()] == [1]
+
+    assert client.delete(f'/api/designs/{second}', headers=auth_headers).status_code == 200
+    assert DesignArtifact.query.count() == 0
+
+
+def test_user_cascade_releases_artifacts(client, auth_headers, user):
+    results = design_results(client, auth_headers)
+    save(client, auth_headers, 'a', results)
+    save(client, auth_headers, 'b', results)
+
+    db.session.delete(db.session.get(User, user.id))
+    db.session.commit()
+
+    assert FilterDesign.query.count() == 0
+    assert DesignArtifact.query.count() == 0
+
+
+def test_garbage_collection_recounts_after_bulk_delete(client, auth_headers):
+    results = design_results(client, auth_headers)
+    for name in 'abc':
+        save(client, auth_headers, name, results)
+
+    # Bulk deletes bypass the after_delete listener and leave ref_count stale
+    FilterDesign.query.filter(FilterDesign.name.in_(['a', 'b'])).delete(synchronize_session=False)
+    db.session.commit()
+    assert DesignArtifact.query.count() == 1
+    assert DesignArtifact.query.one().ref_count == 3
+
+    assert DesignArtifact.collect_garbage() == 0
+    db.session.commit()
+    assert DesignArtifact.query.one().ref_count == 1
+
+    FilterDesign.query.delete(synchronize_session=False)
+    db.session.commit()
+    assert DesignArtifact.collect_garbage() == 1
+    db.session.commit()
+    assert DesignArtifact.query.count() == 0
+
+
+def test_failed_save_leaves_no_artifact(client, auth_headers):
+    results = design_results(client, auth_headers)
+
+    response = save(client, auth_headers, 'bad tags', results, tags=123)
+
+    assert response.status_code == 500
+    db.session.expire_all()
+    assert DesignArtifact.query.count() == 0
+    assert FilterDesign.query.count() == 0
+
+
+def test_migrate_legacy_designs(app, user):
+    # Recreate the pre-artifact filter_designs table with inline content
+    FilterDesign.__table__.drop(db.engine)
+    db.session.execute(text(
+        'CREATE TABLE filter_designs (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+        'name VARCHAR(255) NOT NULL, description TEXT, created_at DATETIME, updated_at DATETIME, '
+        'filter_class VARCHAR(10), filter_type VARCHAR(20), method VARCHAR(50), '
+        'specifications TEXT, coefficients TEXT, responses TEXT, tags VARCHAR(500), is_favorite BOOLEAN)'
+    ))
+    content = {
+        'specifications': json.dumps(PARAMS),
+        'coefficients': json.dumps({'b': [0.5, 0.5], 'a': [1.0]}),
+        'responses': json.dumps({'impulse_response': [0.5, 0.5]})
+    }
+    for design_id, name in [(1, 'a'), (2, 'b')]:
+        db.session.execute(text(
+            'INSERT INTO filter_designs (id, user_id, name, specifications, coefficients, responses) '
+            'VALUES (:id, :user_id, :name, :specifications, :coefficients, :responses)'
+        ), {'id': design_id, 'user_id': user.id, 'name': name, **content})
+    db.session.commit()
+
+    assert migrate_legacy_designs() == 2
+    assert migrate_legacy_designs() == 0
+
+    assert artifact_counts() == [(1, 2)]
+    leftovers = db.session.execute(text(
+        'SELECT COUNT(*) FROM filter_designs WHERE specifications IS NOT NULL'
+    )).scalar()
+    assert leftovers == 0
+    indexes = db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+    assert 'ix_filter_designs_artifact_id' in indexes
+
+    design = db.session.get(FilterDesign, 1).to_dict(include_details=True)
+    assert design['coefficients'] == {'b': [0.5, 0.5], 'a': [1.0]}
+    assert design['specifications'] == PARAMS